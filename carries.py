@@ -1,23 +1,13 @@
-from abc import ABC, abstractmethod
-from threading import Lock
-from typing import Dict, Optional, Type, List
+from collections import defaultdict, deque
+from functools import lru_cache
+from typing import Callable, DefaultDict, Deque, Dict, Hashable, Mapping, Optional, Type, List, Tuple
+import types
+import sys
 import weakref
 from datetime import datetime, timedelta
 #승환
-# 싱글톤 데코레이터
-def singleton(cls):
-    instances = {}
-    def get_instance(*args, **kwargs):
-        if cls not in instances:
-            instances[cls] = cls(*args, **kwargs)
-        return instances[cls]
-    return get_instance
-
-# 데이터베이스 매니저 싱글톤 클래스
-@singleton
+# 데이터베이스 매니저 클래스 (공유 인스턴스는 아래 db_manager 하나만 사용)
 class DatabaseManager:
-    _lock = Lock()
-
     def __init__(self):
         self._data = {}
 
@@ -27,338 +17,490 @@ class DatabaseManager:
     def set_data(self, key: str, value: str) -> None:
         self._data[key] = value
 
-# 배송 전략 추상 클래스
-class ShippingStrategy(ABC):
-    @abstractmethod
+# 모듈 import 시점에 한 번만 생성되는 공유 인스턴스
+db_manager = DatabaseManager()
+
+# 필수 메서드가 기반 클래스의 기본 구현 그대로 남아 있으면 클래스 생성 시점에 오류
+def _check_implemented(cls: type, base: type, names: Tuple[str, ...]) -> None:
+    missing = [name for name in names if getattr(cls, name) is getattr(base, name)]
+    if missing:
+        raise TypeError(f"{cls.__name__}에 {', '.join(missing)} 구현이 필요합니다.")
+
+# 배송 전략 추상 클래스 (중간 추상 클래스는 abstract=True로 선언)
+class ShippingStrategy:
+    __slots__ = ()
+
+    def __init_subclass__(cls, abstract: bool = False, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not abstract:
+            _check_implemented(cls, ShippingStrategy, ("calculate_cost", "get_delivery_steps", "calculate_arrival_time"))
+
     def calculate_cost(self, item_value: float, destination_country: str = "", item_weight: float = 0) -> float:
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
     def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
     def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        pass
+        raise NotImplementedError
 
-# 일반 배송 전략
-class StandardShipping(ShippingStrategy):
-    def weight_based_fee(self, weight: float) -> float:
-        if weight <= 5:
-            return 0
-        elif weight <= 10:
-            return 2000
-        else:
-            return 5000 + (weight - 10) * 100
+# 배송 단계 문자열 캐시 (같은 템플릿/출발지/목적지/시간 조합은 한 번만 포맷)
+@lru_cache(maxsize=1024)
+def _delivery_steps(templates: Tuple[str, ...], destination: str, origin: str, departure_time: datetime, arrival_time: datetime) -> Tuple[str, ...]:
+    # 템플릿마다 키워드 인자를 새로 묶지 않도록 치환 값은 dict 하나로 공유
+    values = {"origin": origin, "destination": destination, "departure_time": departure_time, "arrival_time": arrival_time}
+    return tuple(t.format_map(values) for t in templates)
 
-    def calculate_cost(self, item_value: float, destination_country: str = "", item_weight: float = 0) -> float:
-        base_cost = 5000
-        weight_cost = self.weight_based_fee(item_weight)
-        return base_cost + weight_cost
+# 무게별 추가 요금 (5kg 이하 0원, 10kg 이하 2000원, 초과 시 5000원 + 1kg당 100원)
+def weight_based_fee(weight: float) -> float:
+    over5 = max(weight - 5, 0)
+    over10 = max(weight - 10, 0)
+    return 2000 * (over5 > 0) + 3000 * (over10 > 0) + 100 * over10
+
+# 배송 단계 템플릿 믹스인 (클래스마다 _STEP_TEMPLATES만 다르게 지정)
+class StepTemplateMixin:
+    __slots__ = ()
+
+    _STEP_TEMPLATES: Tuple[str, ...] = ("{origin}에서 {departure_time}에 출발", "배송 중", "{destination}에 {arrival_time}에 도착", "배송 완료")
 
     def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
         arrival_time = self.calculate_arrival_time(departure_time)
-        return [f"{origin}에서 {departure_time}에 출발", "배송 중", f"{destination}에 {arrival_time}에 도착", "배송 완료"]
+        return list(_delivery_steps(self._STEP_TEMPLATES, destination, origin, departure_time, arrival_time))
+
+# 일반 배송 전략
+class StandardShipping(StepTemplateMixin, ShippingStrategy):
+    __slots__ = ()
+
+    _DELTA = timedelta(days=2, hours=0)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def calculate_cost(item_value: float, destination_country: str = "", item_weight: float = 0) -> float:
+        base_cost = 5000
+        weight_cost = weight_based_fee(item_weight)
+        return base_cost + weight_cost
 
     def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=2, hours=0)
+        return departure_time + self._DELTA
 
 # 익일 배송 전략
-class NextDayShipping(ShippingStrategy):
-    def weight_based_fee(self, weight: float) -> float:
-        if weight <= 5:
-            return 0
-        elif weight <= 10:
-            return 2000
-        else:
-            return 5000 + (weight - 10) * 100
-    
-    def calculate_cost(self, item_value: float, destination_country: str = "", item_weight: float = 0) -> float:
+class NextDayShipping(StepTemplateMixin, ShippingStrategy):
+    __slots__ = ()
+
+    _DELTA = timedelta(days=1, hours=0)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def calculate_cost(item_value: float, destination_country: str = "", item_weight: float = 0) -> float:
         base_cost = 20000
-        weight_cost = self.weight_based_fee(item_weight)
+        weight_cost = weight_based_fee(item_weight)
         return base_cost + weight_cost
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return [f"{origin}에서 {departure_time}에 출발", "배송 중", f"{destination}에 {arrival_time}에 도착", "배송 완료"]
-
     def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=1, hours=0)
+        return departure_time + self._DELTA
 
 # 국제 배송 전략
-class InternationalShipping(ShippingStrategy):
-    def weight_based_fee(self, weight: float) -> float:
-        if weight <= 5:
-            return 0
-        elif weight <= 10:
-            return 2000
-        else:
-            return 5000 + (weight - 10) * 100
+class InternationalShipping(StepTemplateMixin, ShippingStrategy):
+    __slots__ = ()
 
-    def calculate_cost(self, item_value: float, destination_country: str = "", item_weight: float = 0) -> float:
+    _DELTA = timedelta(days=7, hours=0)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def calculate_cost(item_value: float, destination_country: str = "", item_weight: float = 0) -> float:
         base_cost = 15000
-        weight_cost = self.weight_based_fee(item_weight)
+        weight_cost = weight_based_fee(item_weight)
         return base_cost + weight_cost
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return [f"{origin}에서 {departure_time}에 출발", "배송 중", f"{destination}에 {arrival_time}에 도착", "배송 완료"]
-
     def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=7, hours=0)
+        return departure_time + self._DELTA
 
 # 배송 데코레이터 추상 클래스
-class ShippingDecorator(ShippingStrategy):
+class ShippingDecorator(ShippingStrategy, abstract=True):
+    __slots__ = ('_base', '_surcharges')
+
+    # 구체 데코레이터는 추가 요금(surcharge)을 반드시 구현
+    def __init_subclass__(cls, abstract: bool = False, **kwargs):
+        super().__init_subclass__(abstract=abstract, **kwargs)
+        if not abstract:
+            _check_implemented(cls, ShippingDecorator, ("surcharge",))
+
+    # 데코레이터가 겹쳐도 생성 시점에 한 번만 펼쳐서, 원래 전략과 추가 요금 함수 목록만 보관
     def __init__(self, wrapped: ShippingStrategy):
-        self._wrapped = wrapped
+        if isinstance(wrapped, ShippingDecorator):
+            self._base: ShippingStrategy = wrapped._base
+            self._surcharges: Tuple[Callable[[float], float], ...] = wrapped._surcharges + (self.surcharge,)
+        else:
+            self._base = wrapped
+            self._surcharges = (self.surcharge,)
+
+    @staticmethod
+    def surcharge(item_value: float) -> float:
+        raise NotImplementedError
 
     def calculate_cost(self, item_value: float, destination_country: str = "", item_weight: float = 0) -> float:
-        return self._wrapped.calculate_cost(item_value, destination_country, item_weight)
+        cost = self._base.calculate_cost(item_value, destination_country, item_weight)
+        for surcharge in self._surcharges:
+            cost += surcharge(item_value)
+        return cost
 
     def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        return self._wrapped.get_delivery_steps(destination, origin, departure_time)
+        return self._base.get_delivery_steps(destination, origin, departure_time)
 
     def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return self._wrapped.calculate_arrival_time(departure_time)
+        return self._base.calculate_arrival_time(departure_time)
 
 # 보험 데코레이터 클래스
 class InsuranceDecorator(ShippingDecorator):
-    def calculate_cost(self, item_value: float, item_weight: float = 0) -> float:
-        insurance_cost = item_value * 0.1  # 상품 가격의 10%를 보험료로 계산
-        return super().calculate_cost(item_value, "", item_weight) + insurance_cost
-
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        return super().get_delivery_steps(destination, origin, departure_time)
+    __slots__ = ()
 
-    def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return super().calculate_arrival_time(departure_time)
+    @staticmethod
+    def surcharge(item_value: float) -> float:
+        return item_value * 0.1  # 상품 가격의 10%를 보험료로 계산
 
 # 택배 회사 전략 추상 클래스
-class CompanyStrategy(ShippingStrategy):
+class CompanyStrategy(ShippingStrategy, abstract=True):
+    __slots__ = ()
+
     def calculate_additional_cost(self) -> float:
         pass
 
-    @abstractmethod
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        pass
+# 각 택배 회사 클래스들
+class Hanjin(StepTemplateMixin, CompanyStrategy):
+    __slots__ = ()
 
-    @abstractmethod
-    def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        pass
+    _STEP_TEMPLATES = ("{origin}에서 {departure_time}에 출발", "{destination}에 {arrival_time}에 도착")
+    _DELTA = timedelta(days=3, hours=3)
 
-# 각 택배 회사 클래스들
-class Hanjin(CompanyStrategy):
     def calculate_cost(self, item_value: float, destination_country: str = "", item_weight: float = 0) -> float:
         return 2500
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return [f"{origin}에서 {departure_time}에 출발", f"{destination}에 {arrival_time}에 도착"]
-
     def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=3, hours=3)
+        return departure_time + self._DELTA
+
+class PostOffice(StepTemplateMixin, CompanyStrategy):
+    __slots__ = ()
+
+    _STEP_TEMPLATES = ("접수", "{arrival_time} 도착 예정", "{destination}에 도착")
+    _DELTA = timedelta(days=1, hours=2)
 
-class PostOffice(CompanyStrategy):
     def calculate_cost(self, item_value: float, destination_country: str = "", item_weight: float = 0) -> float:
         return 2000
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return ["접수", f"{arrival_time} 도착 예정", f"{destination}에 도착"]
-
     def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=1, hours=2)
+        return departure_time + self._DELTA
+
+class CJ(StepTemplateMixin, CompanyStrategy):
+    __slots__ = ()
+
+    _STEP_TEMPLATES = ("접수", "방금 출발", "지금 배송 중", "오늘 도착 예정", "{destination} 에 도착")
+    _DELTA = timedelta(days=2, hours=5)
 
-class CJ(CompanyStrategy):
     def calculate_cost(self, item_value: float, destination_country: str = "", item_weight: float = 0) -> float:
         return 3000
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return ["접수", "방금 출발", "지금 배송 중", "오늘 도착 예정", f"{destination} 에 도착"]
-
     def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=2, hours=5)
+        return departure_time + self._DELTA
+
+class Lotte(StepTemplateMixin, CompanyStrategy):
+    __slots__ = ()
+
+    _STEP_TEMPLATES = ("배송 준비 완료", "배송 중", "{destination} 에 도착")
+    _DELTA = timedelta(days=3, hours=12)
 
-class Lotte(CompanyStrategy):
     def calculate_cost(self, item_value: float, destination_country: str = "", item_weight: float = 0) -> float:
         return 2500
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return ["배송 준비 완료", "배송 중", f"{destination} 에 도착"]
-
     def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=3, hours=12)
+        return departure_time + self._DELTA
+
+class DHL(StepTemplateMixin, CompanyStrategy):
+    __slots__ = ()
+
+    _STEP_TEMPLATES = ("{origin}에서 {departure_time}에 출발", "배송 중", "{destination}에 {arrival_time} 에 도착", "배송 완료")
+    _DELTA = timedelta(days=5, hours=0)
 
-class DHL(CompanyStrategy):
     def calculate_cost(self, item_value: float, destination_country: str = "", item_weight: float = 0) -> float:
         return 40000
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return [f"{origin}에서 {departure_time}에 출발", "배송 중", f"{destination}에 {arrival_time} 에 도착", "배송 완료"]
-
     def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=5, hours=0)
+        return departure_time + self._DELTA
+
+class Amazon(StepTemplateMixin, CompanyStrategy):
+    __slots__ = ()
+
+    _STEP_TEMPLATES = ("{origin}에서 {departure_time}에 출발", "배송 중", "{destination}에 {arrival_time} 에 도착", "배송 완료")
+    _DELTA = timedelta(days=7, hours=0)
 
-class Amazon(CompanyStrategy):
     def calculate_cost(self, item_value: float, destination_country: str = "", item_weight: float = 0) -> float:
         return 40000
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return [f"{origin}에서 {departure_time}에 출발", "배송 중", f"{destination}에 {arrival_time} 에 도착", "배송 완료"]
-
     def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=7, hours=0)
+        return departure_time + self._DELTA
+
+class EMS(StepTemplateMixin, CompanyStrategy):
+    __slots__ = ()
+
+    _DELTA = timedelta(days=5, hours=0)
 
-class EMS(CompanyStrategy):
     def calculate_cost(self, item_value: float, destination_country: str = "", item_weight: float = 0) -> float:
         return 40000
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return [f"{origin}에서 {departure_time}에 출발", "배송 중", f"{destination}에 {arrival_time}에 도착", "배송 완료"]
-
     def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=5, hours=0)
+        return departure_time + self._DELTA
+
+class FedEx(StepTemplateMixin, CompanyStrategy):
+    __slots__ = ()
+
+    _DELTA = timedelta(days=7, hours=0)
 
-class FedEx(CompanyStrategy):
     def calculate_cost(self, item_value: float, destination_country: str = "", item_weight: float = 0) -> float:
         return 40000
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return [f"{origin}에서 {departure_time}에 출발", "배송 중", f"{destination}에 {arrival_time}에 도착", "배송 완료"]
-
     def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=7, hours=0)
+        return departure_time + self._DELTA
 
-# 배송 전략과 데코레이터, 택배사 팩토리
+# 배송 전략과 데코레이터, 택배사 팩토리 (상태가 없는 전략/택배사는 미리 만든 인스턴스를 공유)
+# 등록표는 읽기 전용이고, 다른 조합이 필요하면 하위 클래스에서 등록표를 새로 지정
 class ShippingFactory:
-    strategies: Dict[str, Type[ShippingStrategy]] = {
-        "일반": StandardShipping,
-        "익일": NextDayShipping,
-        "국제": InternationalShipping
-    }
+    strategies: Mapping[str, ShippingStrategy] = types.MappingProxyType({
+        "일반": StandardShipping(),
+        "익일": NextDayShipping(),
+        "국제": InternationalShipping()
+    })
 
-    decorators: Dict[str, Type[ShippingDecorator]] = {
+    decorators: Mapping[str, Type[ShippingDecorator]] = types.MappingProxyType({
         "보험": InsuranceDecorator,
-    }
-
-    companies: Dict[str, Type[CompanyStrategy]] = {
-        "한진": Hanjin,
-        "우체국": PostOffice,
-        "CJ": CJ,
-        "롯데": Lotte,
-        "DHL": DHL,
-        "Amazon": Amazon,
-        "EMS": EMS,
-        "FedEx": FedEx
-    }
+    })
+
+    companies: Mapping[str, CompanyStrategy] = types.MappingProxyType({
+        "한진": Hanjin(),
+        "우체국": PostOffice(),
+        "CJ": CJ(),
+        "롯데": Lotte(),
+        "DHL": DHL(),
+        "Amazon": Amazon(),
+        "EMS": EMS(),
+        "FedEx": FedEx()
+    })
+
+    # (배송 유형, 데코레이터, 택배사) 조합을 팩토리마다 한 번만 구성해서 한 번의 dict 조회로 전략을 찾음
+    # 택배사를 지정하면 유형/데코레이터와 무관하게 택배사 전략을 쓰므로 (None, None, 택배사)로 보관
+    def __init__(self):
+        self._resolved: Dict[Tuple[Optional[str], Optional[str], Optional[str]], ShippingStrategy] = {
+            **{(name, None, None): strategy for name, strategy in self.strategies.items()},
+            **{(name, decorator, None): ctor(strategy) for name, strategy in self.strategies.items() for decorator, ctor in self.decorators.items()},
+            **{(None, None, company): strategy for company, strategy in self.companies.items()},
+        }
 
     def get_shipping_strategy(self, type: str, decorator: Optional[str] = None, company: Optional[str] = None) -> ShippingStrategy:
-        try:
-            if company:
-                strategy = self.companies[company]()
-            else:
-                strategy = self.strategies[type]()
-                if decorator:
-                    strategy = self.decorators[decorator](strategy)
-            return strategy
-        except KeyError:
+        strategy = self._resolved.get((None, None, company) if company else (type, decorator or None, None))
+        if strategy is None:
             raise ValueError(f"오류 발생: {type} 또는 {decorator}는 지원되지 않는 옵션입니다.")
+        return strategy
         
         
+# 이벤트 종류 (옵저버 dict의 키로 쓰이므로 intern해서 조회가 동일성 비교로 끝나게 함)
+EVENT_STATUS = sys.intern("배송 상태")
+
 # 옵저버 패턴 구현
 class Subject:
+    __slots__ = ('_observers', '_state')
+
     def __init__(self):
-        self._observers: Dict[str, List[weakref.ref]] = {}
+        self._observers: DefaultDict[str, Dict[Hashable, weakref.ref]] = defaultdict(dict)
         self._state: Optional[str] = None
 
+    # 옵저버 객체뿐 아니라 바운드 메서드(branch.update 등)도 등록 가능
+    # 바운드 메서드는 접근할 때마다 새로 만들어지므로 WeakMethod로 보관하고 (객체, 함수)로 식별
+    @staticmethod
+    def _observer_key(observer) -> Hashable:
+        if isinstance(observer, types.MethodType):
+            return (id(observer.__self__), observer.__func__)
+        return id(observer)
+
+    # 등록 순서를 유지하면서 O(1) 등록/해제
+    # 옵저버가 수거되면 콜백으로 자기 항목을 바로 지워서 죽은 참조가 쌓이지 않게 함
     def attach(self, observer, event_type: str) -> None:
-        if event_type not in self._observers:
-            self._observers[event_type] = []
-        self._observers[event_type].append(weakref.ref(observer))
+        observers = self._observers[event_type]
+        key = self._observer_key(observer)
+
+        def remove(weak_observer: weakref.ref) -> None:
+            if observers.get(key) is weak_observer:
+                del observers[key]
+
+        if isinstance(observer, types.MethodType):
+            observers[key] = weakref.WeakMethod(observer, remove)
+        else:
+            observers[key] = weakref.ref(observer, remove)
 
     def detach(self, observer, event_type: str) -> None:
-        try:
-            self._observers[event_type].remove(weakref.ref(observer))
-        except (ValueError, KeyError):
-            pass
+        self._observers.get(event_type, {}).pop(self._observer_key(observer), None)
 
-    def notify(self, event_type: str) -> None:
-        for weak_observer in self._observers.get(event_type, []):
+    # 이벤트의 옵저버마다 상태 목록을 한 번에 전달 (바운드 메서드는 상태마다 호출)
+    # 알림 중에 옵저버가 detach하거나, 수거된 옵저버의 정리 콜백이 항목을 지워도 되도록 등록표의 스냅샷을 순회
+    def _dispatch(self, event_type: str, states: List[str]) -> None:
+        for weak_observer in tuple(self._observers.get(event_type, {}).values()):
             observer = weak_observer()
-            if observer is not None:
-                observer.update(self._state)
+            if observer is None:
+                continue
+            if isinstance(weak_observer, weakref.WeakMethod):
+                for state in states:
+                    observer(state)
+                continue
+            # Observer를 상속하지 않고 update만 있는 옵저버는 상태마다 update 호출
+            update_batch = getattr(observer, "update_batch", None)
+            if update_batch is not None:
+                update_batch(states)
+            else:
+                for state in states:
+                    observer.update(state)
+
+    def notify(self, event_type: str) -> None:
+        self._dispatch(event_type, [self._state])
 
     def set_state(self, state: str, event_type: str) -> None:
         self._state = state
         self.notify(event_type)
 
 # 옵저버 추상 클래스
-class Observer(ABC):
-    @abstractmethod
+class Observer:
+    __slots__ = ()
+
+    def __init_subclass__(cls, abstract: bool = False, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not abstract:
+            _check_implemented(cls, Observer, ("update",))
+
     def update(self, state: str) -> None:
-        pass
+        raise NotImplementedError
+
+    def update_batch(self, states: List[str]) -> None:
+        for state in states:
+            self.update(state)
+
+# 패키지 단위로 모아서 한 번에 출력하는 메시지 버퍼
+LogBuffer = List[str]
 
 # 지점 클래스(옵저버 구현)
 class Branch(Observer):
-    def __init__(self, name: str):
+    __slots__ = ('name', 'buffer', '__weakref__')
+
+    def __init__(self, name: str, buffer: Optional[LogBuffer] = None):
         self.name = name
+        self.buffer = buffer
 
     def update(self, state: str) -> None:
-        print(f"{self.name} 알림: {state}")
+        message = f"{self.name} 알림: {state}"
+        if self.buffer is not None:
+            self.buffer.append(message)
+        else:
+            print(message)
+
+    def update_batch(self, states: List[str]) -> None:
+        message = "\n".join(f"{self.name} 알림: {state}" for state in states)
+        if self.buffer is not None:
+            self.buffer.append(message)
+        else:
+            print(message)
 
 # 패키지 추적 클래스
 class PackageTracker:
-    def __init__(self, package_id: str):
+    __slots__ = ('package_id', 'history', 'buffer')
+
+    def __init__(self, package_id: str, buffer: Optional[LogBuffer] = None):
         self.package_id = package_id
-        self.history = []
+        self.history: Deque[str] = deque()
+        self.buffer = buffer
 
     def update_status(self, status: str):
         self.history.append(status)
-        print(f"패키지 {self.package_id} 상태 업데이트: {status}")
+        message = f"패키지 {self.package_id} 상태 업데이트: {status}"
+        if self.buffer is not None:
+            self.buffer.append(message)
+        else:
+            print(message)
 
-    def get_history(self) -> List[str]:
+    def update_statuses(self, statuses: List[str]) -> None:
+        self.history.extend(statuses)
+        message = "\n".join(f"패키지 {self.package_id} 상태 업데이트: {status}" for status in statuses)
+        if self.buffer is not None:
+            self.buffer.append(message)
+        else:
+            print(message)
+
+    # 복사하지 않고 내부 기록을 그대로 반환하므로 호출 측에서 수정하지 말 것
+    def get_history(self) -> Deque[str]:
         return self.history
 
 # 추적 가능한 패키지 클래스 (옵저버 패턴 구현)
 class TrackedPackage(Subject):
-    def __init__(self, package_id: str):
+    __slots__ = ('tracker',)
+
+    def __init__(self, package_id: str, buffer: Optional[LogBuffer] = None):
         super().__init__()
-        self.tracker = PackageTracker(package_id)
+        self.tracker = PackageTracker(package_id, buffer)
 
     def set_state(self, state: str, event_type: str) -> None:
         self.tracker.update_status(state)
-        self._state = state
-        self.notify(event_type)
+        super().set_state(state, event_type)
 
-# 추적 가능한 패키지 설정 함수
-def setup_tracked_package(destination: str, origin: str, shipping_type: str, package_id: str, decorator: Optional[str], company: Optional[str], item_value: float, destination_country: str, item_weight: float) -> None:
-    package = TrackedPackage(package_id)
-    branch_name = destination.capitalize() + " 지점"
-    branch = Branch(branch_name)
-    package.attach(branch, "배송 상태")
+    # 여러 상태 전이를 한 번에 기록하고, 옵저버마다 상태 목록을 한 번만 전달
+    def set_states(self, states: List[str], event_type: str) -> None:
+        if not states:
+            return
+        self.tracker.update_statuses(states)
+        self._state = states[-1]
+        self._dispatch(event_type, states)
 
-    # Use the current time as the departure time.
-    departure_time = datetime.now()
+# 목적지별 지점 이름 (같은 목적지는 한 번만 만듦)
+@lru_cache(maxsize=256)
+def _branch_name(destination: str) -> str:
+    return destination.capitalize() + " 지점"
 
+# 추적 가능한 패키지 설정 함수
+def setup_tracked_package(destination: str, origin: str, shipping_type: str, package_id: str, decorator: Optional[str], company: Optional[str], item_value: float, destination_country: str, item_weight: float, branch: Optional[Branch] = None, departure_time: Optional[datetime] = None) -> None:
+    # 잘못된 옵션이면 지점 등 호출 측 객체를 건드리기 전에 ValueError
     shipping_option = shipping_factory.get_shipping_strategy(shipping_type, decorator, company)
+
+    log_buffer: LogBuffer = []
+    package = TrackedPackage(package_id, log_buffer)
+
+    # Use the current time as the departure time unless the caller captured one.
+    if departure_time is None:
+        departure_time = datetime.now()
+
     arrival_time = shipping_option.calculate_arrival_time(departure_time)
     
     cost = shipping_option.calculate_cost(item_value, destination_country, item_weight)
     
-    print(f"패키지 ID: {package_id}\n목적지: {destination}\n출발지: {origin}\n출발 시간: {departure_time}\n도착 예정 시간: {arrival_time}\n배송 유형: {shipping_type}\n데코레이터: {decorator}\n택배 회사: {company}\n비용: {cost} 원")
+    log_buffer.append(f"패키지 ID: {package_id}\n목적지: {destination}\n출발지: {origin}\n출발 시간: {departure_time}\n도착 예정 시간: {arrival_time}\n배송 유형: {shipping_type}\n데코레이터: {decorator}\n택배 회사: {company}\n비용: {cost} 원")
 
     steps = shipping_option.get_delivery_steps(destination, origin, departure_time)
-    for step in steps:
-        package.set_state(step, "배송 상태")
-    package.detach(branch, "배송 상태")
-
-    print(f"패키지 {package_id} 배송 기록:\n" + "\n".join(package.tracker.get_history()))
+    # 호출 측에서 목적지별로 미리 만든 지점을 넘기면 재사용 (예외가 나도 등록과 버퍼를 원래대로 되돌림)
+    if branch is None:
+        branch = Branch(_branch_name(destination))
+    previous_buffer = branch.buffer
+    branch.buffer = log_buffer
+    package.attach(branch, EVENT_STATUS)
+    try:
+        package.set_states(steps, EVENT_STATUS)
+    finally:
+        package.detach(branch, EVENT_STATUS)
+        branch.buffer = previous_buffer
+
+    log_buffer.append(f"패키지 {package_id} 배송 기록:\n" + "\n".join(package.tracker.history))
+    sys.stdout.write("\n".join(log_buffer) + "\n")
+
+# 패키지 ID 접미사: 문자열을 이어 붙여 다시 해시하지 않고 필드별 해시를 순서대로 섞음
+_GOLDEN_RATIO_64 = 0x9E3779B97F4A7C15
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+def combine_hashes(*hashes: int) -> int:
+    combined = 0
+    for value in hashes:
+        combined = (combined ^ value) * _GOLDEN_RATIO_64 & _MASK_64
+    return combined
 
 # 팩토리 인스턴스 생성
 shipping_factory = ShippingFactory()
@@ -380,24 +522,30 @@ def select_send_location(is_international: bool) -> str:
     else:
         return input('보내는 사람의 지역을 입력하세요: ').strip()
 
-# 사용자 입력
-print("어서오세요! \n택배는 사랑을 싣고 입니다! ")
-is_international = input('해외 배송인가요? (예/아니오): ').strip().lower() == '예'
-if is_international:
-    shipping_type = "국제"
-    company = input('해외 택배 회사를 선택하세요 (DHL/Amazon/EMS/FedEx): ').strip()
-else:
-    shipping_type = input('배송 방법을 입력하세요 (일반/익일): ').strip()
-    company = input('택배 회사를 선택하세요 (한진/로젠/우체국/CJ/롯데): ').strip()
-origin = select_send_location(is_international)
-destination = select_receive_location(is_international)
-item_weight = float(input('물품 무게를 입력하세요 (kg): ').strip())
-
-decorator = input('보험을 선택하실 경우 입력하신 상품 가격의 10%가 추가 됩니다. (보험/없음): ').strip()
-decorator = None if decorator == "없음" else decorator
-item_value = float(input('상품 가격을 입력하세요 (원): ').strip())
-destination_country = destination.split(",")[-1].strip()
-
-# 패키지 ID 생성 및 설정
-package_id = f"{destination}_{origin}_{shipping_type}_{company}_{hash(destination + origin + shipping_type + company)}"
-setup_tracked_package(destination, origin, shipping_type, package_id, decorator, company, item_value, destination_country, item_weight)
+# 사용자 입력을 받아 패키지 하나를 설정 (import 시에는 실행되지 않음)
+def main() -> None:
+    print("어서오세요! \n택배는 사랑을 싣고 입니다! ")
+    is_international = input('해외 배송인가요? (예/아니오): ').strip().lower() == '예'
+    if is_international:
+        shipping_type = "국제"
+        company = input('해외 택배 회사를 선택하세요 (DHL/Amazon/EMS/FedEx): ').strip()
+    else:
+        shipping_type = input('배송 방법을 입력하세요 (일반/익일): ').strip()
+        company = input('택배 회사를 선택하세요 (한진/로젠/우체국/CJ/롯데): ').strip()
+    origin = select_send_location(is_international)
+    destination = select_receive_location(is_international)
+    item_weight = float(input('물품 무게를 입력하세요 (kg): ').strip())
+
+    decorator = input('보험을 선택하실 경우 입력하신 상품 가격의 10%가 추가 됩니다. (보험/없음): ').strip()
+    decorator = None if decorator == "없음" else decorator
+    item_value = float(input('상품 가격을 입력하세요 (원): ').strip())
+    destination_country = destination.split(",")[-1].strip()
+
+    # 패키지 ID 생성 및 설정
+    package_id = f"{destination}_{origin}_{shipping_type}_{company}_{combine_hashes(hash(destination), hash(origin), hash(shipping_type), hash(company))}"
+    branch = Branch(_branch_name(destination))
+    departure_time = datetime.now()
+    setup_tracked_package(destination, origin, shipping_type, package_id, decorator, company, item_value, destination_country, item_weight, branch, departure_time)
+
+if __name__ == "__main__":
+    main()
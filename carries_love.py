@@ -1,27 +1,22 @@
-from abc import ABC, abstractmethod
-from threading import Lock
-from typing import Dict, Optional, Type, List
+from collections import defaultdict, deque
+from functools import lru_cache
+from itertools import count
+from secrets import token_hex
+from typing import Callable, DefaultDict, Deque, Dict, Hashable, Mapping, NamedTuple, Optional, Type, List, Tuple
+import re
+import types
+import sys
 import logging
 import weakref
 from datetime import datetime, timedelta
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# 루트 로거를 매번 찾지 않도록 모듈 로거를 한 번만 가져옴
+logger = logging.getLogger(__name__)
 
-# 싱글톤 데코레이터
-def singleton(cls):
-    instances = {}
-    def get_instance(*args, **kwargs):
-        if cls not in instances:
-            instances[cls] = cls(*args, **kwargs)
-        return instances[cls]
-    return get_instance
-
-# 데이터베이스 매니저 싱글톤 클래스
-@singleton
+# 데이터베이스 매니저 클래스 (공유 인스턴스는 아래 db_manager 하나만 사용)
 class DatabaseManager:
-    _lock = Lock()
-
     def __init__(self):
         self._data = {}
 
@@ -31,333 +26,423 @@ class DatabaseManager:
     def set_data(self, key: str, value: str) -> None:
         self._data[key] = value
 
-# 배송 전략 추상 클래스
-class ShippingStrategy(ABC):
-    @abstractmethod
-    def calculate_cost(self, item_value: float, destination_country: str = "") -> float:
-        pass
+# 모듈 import 시점에 한 번만 생성되는 공유 인스턴스
+db_manager = DatabaseManager()
 
-    @abstractmethod
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        pass
+# 필수 메서드가 기반 클래스의 기본 구현 그대로 남아 있으면 클래스 생성 시점에 오류
+def _check_implemented(cls: type, base: type, names: Tuple[str, ...]) -> None:
+    missing = [name for name in names if getattr(cls, name) is getattr(base, name)]
+    if missing:
+        raise TypeError(f"{cls.__name__}에 {', '.join(missing)} 구현이 필요합니다.")
 
-    @abstractmethod
-    def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        pass
+# 배송 전략 추상 클래스 (중간 추상 클래스는 abstract=True로 선언)
+class ShippingStrategy:
+    __slots__ = ()
 
-# 일반 배송 전략
-class StandardShipping(ShippingStrategy):
-    def calculate_cost(self, item_value: float, destination_country: str = "") -> float:
-        return 5000
+    def __init_subclass__(cls, abstract: bool = False, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not abstract:
+            _check_implemented(cls, ShippingStrategy, ("calculate_cost", "get_delivery_steps", "calculate_arrival_time"))
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return [f"{origin}에서 {departure_time}에 출발", "배송 중", f"{destination}에 {arrival_time}에 도착", "배송 완료"]
-
-    def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=2, hours=0)
-
-# 익일 배송 전략
-class NextDayShipping(ShippingStrategy):
     def calculate_cost(self, item_value: float, destination_country: str = "") -> float:
-        return 20000
+        raise NotImplementedError
 
     def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return [f"{origin}에서 {departure_time}에 출발", "배송 중", f"{destination}에 {arrival_time}에 도착", "배송 완료"]
+        raise NotImplementedError
 
     def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=1, hours=0)
+        raise NotImplementedError
 
-# 국제 배송 전략
-class InternationalShipping(ShippingStrategy):
-    def calculate_cost(self, item_value: float, destination_country: str = "") -> float:
-        return 15000
+# 배송 단계 문자열 캐시 (같은 템플릿/출발지/목적지/시간 조합은 한 번만 포맷)
+@lru_cache(maxsize=2048)
+def _delivery_steps(templates: Tuple[str, ...], destination: str, origin: str, departure_time: datetime, arrival_time: datetime) -> Tuple[str, ...]:
+    # 템플릿마다 키워드 인자를 새로 묶지 않도록 치환 값은 dict 하나로 공유
+    values = {"origin": origin, "destination": destination, "departure_time": departure_time, "arrival_time": arrival_time}
+    return tuple(t.format_map(values) for t in templates)
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return [f"{origin}에서 {departure_time}에 출발", "배송 중", f"{destination}에 {arrival_time}에 도착", "배송 완료"]
+# 전략마다 다른 값(고정 요금, 소요 시간, 배송 단계 템플릿)만 모은 설정
+class ShippingSpec(NamedTuple):
+    cost: float
+    delta: timedelta
+    steps: Tuple[str, ...] = ("{origin}에서 {departure_time}에 출발", "배송 중", "{destination}에 {arrival_time}에 도착", "배송 완료")
 
-    def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=7, hours=0)
+# 요금/도착 시간/배송 단계를 SPEC 하나로 정하는 믹스인 (클래스마다 SPEC만 다르게 지정)
+class SpecMixin:
+    __slots__ = ()
 
-# 배송 데코레이터 추상 클래스
-class ShippingDecorator(ShippingStrategy):
-    def __init__(self, wrapped: ShippingStrategy):
-        self._wrapped = wrapped
+    SPEC: ShippingSpec
 
-    @abstractmethod
     def calculate_cost(self, item_value: float, destination_country: str = "") -> float:
-        pass
+        return self.SPEC.cost
 
-    @abstractmethod
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        pass
-
-    @abstractmethod
     def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        pass
-
-# 보험 데코레이터 클래스
-class InsuranceDecorator(ShippingDecorator):
-    def calculate_cost(self, item_value: float, destination_country: str = "") -> float:
-        insurance_cost = item_value * 0.01  # 상품 가격의 1%를 보험료로 계산
-        return self._wrapped.calculate_cost(item_value, destination_country) + insurance_cost
+        return departure_time + self.SPEC.delta
 
     def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        return self._wrapped.get_delivery_steps(destination, origin, departure_time)
+        spec = self.SPEC
+        return list(_delivery_steps(spec.steps, destination, origin, departure_time, departure_time + spec.delta))
 
-    def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return self._wrapped.calculate_arrival_time(departure_time)
+# 일반 배송 전략
+class StandardShipping(SpecMixin, ShippingStrategy):
+    __slots__ = ()
 
-# 우선 데코레이터 클래스
-class PriorityDecorator(ShippingDecorator):
-    def calculate_cost(self, item_value: float, destination_country: str = "") -> float:
-        return self._wrapped.calculate_cost(item_value, destination_country) + 10000
+    SPEC = ShippingSpec(5000, timedelta(days=2, hours=0))
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        return self._wrapped.get_delivery_steps(destination, origin, departure_time)
+# 익일 배송 전략
+class NextDayShipping(SpecMixin, ShippingStrategy):
+    __slots__ = ()
 
-    def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return self._wrapped.calculate_arrival_time(departure_time)
+    SPEC = ShippingSpec(20000, timedelta(days=1, hours=0))
 
-# 택배 회사 전략 추상 클래스
-class CompanyStrategy(ShippingStrategy):
-    def calculate_cost(self, item_value: float, destination_country: str = "") -> float:
-        return 0.00
+# 국제 배송 전략
+class InternationalShipping(SpecMixin, ShippingStrategy):
+    __slots__ = ()
 
-    @abstractmethod
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        pass
+    SPEC = ShippingSpec(15000, timedelta(days=7, hours=0))
 
-    @abstractmethod
-    def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        pass
+# 데코레이터 조합의 최종 요금만 캐시 (원래 전략과 추가 요금 함수 목록이 곧 조합을 나타냄)
+@lru_cache(maxsize=1024)
+def _decorated_cost(base: ShippingStrategy, surcharges: Tuple[Callable[[float], float], ...], item_value: float, destination_country: str) -> float:
+    cost = base.calculate_cost(item_value, destination_country)
+    for surcharge in surcharges:
+        cost += surcharge(item_value)
+    return cost
 
-# 각 택배 회사 클래스들
-class Hanjin(CompanyStrategy):
-    def calculate_cost(self, item_value: float, destination_country: str = "") -> float:
-        return 2500
+# 배송 데코레이터 추상 클래스
+class ShippingDecorator(ShippingStrategy, abstract=True):
+    __slots__ = ('_base', '_surcharges')
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return [f"{origin}에서 {departure_time}에 출발", f"{destination}에 {arrival_time}에 도착"]
+    # 구체 데코레이터는 추가 요금(surcharge)을 반드시 구현
+    def __init_subclass__(cls, abstract: bool = False, **kwargs):
+        super().__init_subclass__(abstract=abstract, **kwargs)
+        if not abstract:
+            _check_implemented(cls, ShippingDecorator, ("surcharge",))
 
-    def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=3, hours=3)
+    # 데코레이터가 겹쳐도 생성 시점에 한 번만 펼쳐서, 원래 전략과 추가 요금 함수 목록만 보관
+    def __init__(self, wrapped: ShippingStrategy):
+        if isinstance(wrapped, ShippingDecorator):
+            self._base: ShippingStrategy = wrapped._base
+            self._surcharges: Tuple[Callable[[float], float], ...] = wrapped._surcharges + (self.surcharge,)
+        else:
+            self._base = wrapped
+            self._surcharges = (self.surcharge,)
+
+    @staticmethod
+    def surcharge(item_value: float) -> float:
+        raise NotImplementedError
 
-class Logen(CompanyStrategy):
     def calculate_cost(self, item_value: float, destination_country: str = "") -> float:
-        return 2500
+        return _decorated_cost(self._base, self._surcharges, item_value, destination_country)
 
     def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return ["택배 발송", f"{origin}에서 출발", f"{destination}에 도착"]
+        return self._base.get_delivery_steps(destination, origin, departure_time)
 
     def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=2, hours=2)
+        return self._base.calculate_arrival_time(departure_time)
 
-class PostOffice(CompanyStrategy):
-    def calculate_cost(self, item_value: float, destination_country: str = "") -> float:
-        return 2000
+# 보험 데코레이터 클래스
+class InsuranceDecorator(ShippingDecorator):
+    __slots__ = ()
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return ["접수", f"{arrival_time} 도착 예정", f"{destination}에 도착"]
+    @staticmethod
+    def surcharge(item_value: float) -> float:
+        return item_value * 0.01  # 상품 가격의 1%를 보험료로 계산
 
-    def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=1, hours=2)
+# 우선 데코레이터 클래스
+class PriorityDecorator(ShippingDecorator):
+    __slots__ = ()
+
+    @staticmethod
+    def surcharge(item_value: float) -> float:
+        return 10000
+
+# 택배 회사 전략 추상 클래스
+class CompanyStrategy(ShippingStrategy, abstract=True):
+    __slots__ = ()
 
-class CJ(CompanyStrategy):
     def calculate_cost(self, item_value: float, destination_country: str = "") -> float:
-        return 3000
+        return 0.00
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return ["접수", "방금 출발", "지금 배송 중", "오늘 도착 예정", f"{destination}에 도착"]
+# 각 택배 회사 클래스들
+class Hanjin(SpecMixin, CompanyStrategy):
+    __slots__ = ()
 
-    def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=2, hours=5)
+    SPEC = ShippingSpec(2500, timedelta(days=3, hours=3), ("{origin}에서 {departure_time}에 출발", "{destination}에 {arrival_time}에 도착"))
 
-class Lotte(CompanyStrategy):
-    def calculate_cost(self, item_value: float, destination_country: str = "") -> float:
-        return 2500
+class Logen(SpecMixin, CompanyStrategy):
+    __slots__ = ()
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return ["배송 준비 완료", "배송 중", f"{destination}에 도착"]
+    SPEC = ShippingSpec(2500, timedelta(days=2, hours=2), ("택배 발송", "{origin}에서 출발", "{destination}에 도착"))
 
-    def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=3, hours=12)
+class PostOffice(SpecMixin, CompanyStrategy):
+    __slots__ = ()
 
-class DHL(CompanyStrategy):
-    def calculate_cost(self, item_value: float, destination_country: str = "") -> float:
-        return 40000
+    SPEC = ShippingSpec(2000, timedelta(days=1, hours=2), ("접수", "{arrival_time} 도착 예정", "{destination}에 도착"))
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return [f"{origin}에서 {departure_time}에 출발", "배송 중", f"{destination}에 {arrival_time}에 도착", "배송 완료"]
+class CJ(SpecMixin, CompanyStrategy):
+    __slots__ = ()
 
-    def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=5, hours=0)
+    SPEC = ShippingSpec(3000, timedelta(days=2, hours=5), ("접수", "방금 출발", "지금 배송 중", "오늘 도착 예정", "{destination}에 도착"))
 
-class Amazon(CompanyStrategy):
-    def calculate_cost(self, item_value: float, destination_country: str = "") -> float:
-        return 40000
+class Lotte(SpecMixin, CompanyStrategy):
+    __slots__ = ()
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return [f"{origin}에서 {departure_time}에 출발", "배송 중", f"{destination}에 {arrival_time}에 도착", "배송 완료"]
+    SPEC = ShippingSpec(2500, timedelta(days=3, hours=12), ("배송 준비 완료", "배송 중", "{destination}에 도착"))
 
-    def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=7, hours=0)
+class DHL(SpecMixin, CompanyStrategy):
+    __slots__ = ()
 
-class EMS(CompanyStrategy):
-    def calculate_cost(self, item_value: float, destination_country: str = "") -> float:
-        return 40000
+    SPEC = ShippingSpec(40000, timedelta(days=5, hours=0))
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return [f"{origin}에서 {departure_time}에 출발", "배송 중", f"{destination}에 {arrival_time}에 도착", "배송 완료"]
+class Amazon(SpecMixin, CompanyStrategy):
+    __slots__ = ()
 
-    def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=5, hours=0)
+    SPEC = ShippingSpec(40000, timedelta(days=7, hours=0))
 
-class FedEx(CompanyStrategy):
-    def calculate_cost(self, item_value: float, destination_country: str = "") -> float:
-        return 40000
+class EMS(SpecMixin, CompanyStrategy):
+    __slots__ = ()
 
-    def get_delivery_steps(self, destination: str, origin: str, departure_time: datetime) -> List[str]:
-        arrival_time = self.calculate_arrival_time(departure_time)
-        return [f"{origin}에서 {departure_time}에 출발", "배송 중", f"{destination}에 {arrival_time}에 도착", "배송 완료"]
+    SPEC = ShippingSpec(40000, timedelta(days=5, hours=0))
 
-    def calculate_arrival_time(self, departure_time: datetime) -> datetime:
-        return departure_time + timedelta(days=7, hours=0)
+class FedEx(SpecMixin, CompanyStrategy):
+    __slots__ = ()
+
+    SPEC = ShippingSpec(40000, timedelta(days=7, hours=0))
 
-# 배송 전략과 데코레이터, 택배사 팩토리
+# 배송 전략과 데코레이터, 택배사 팩토리 (상태가 없는 전략/택배사는 미리 만든 인스턴스를 공유)
+# 등록표는 읽기 전용이고, 다른 조합이 필요하면 하위 클래스에서 등록표를 새로 지정
 class ShippingFactory:
-    strategies: Dict[str, Type[ShippingStrategy]] = {
-        "일반": StandardShipping,
-        "익일": NextDayShipping,
-        "국제": InternationalShipping
-    }
+    strategies: Mapping[str, ShippingStrategy] = types.MappingProxyType({
+        "일반": StandardShipping(),
+        "익일": NextDayShipping(),
+        "국제": InternationalShipping()
+    })
 
-    decorators: Dict[str, Type[ShippingDecorator]] = {
+    decorators: Mapping[str, Type[ShippingDecorator]] = types.MappingProxyType({
         "보험": InsuranceDecorator,
         "우선": PriorityDecorator
-    }
-
-    companies: Dict[str, Type[CompanyStrategy]] = {
-        "한진": Hanjin,
-        "로젠": Logen,
-        "우체국": PostOffice,
-        "CJ": CJ,
-        "롯데": Lotte,
-        "DHL": DHL,
-        "Amazon": Amazon,
-        "EMS": EMS,
-        "FedEx": FedEx
-    }
+    })
+
+    companies: Mapping[str, CompanyStrategy] = types.MappingProxyType({
+        "한진": Hanjin(),
+        "로젠": Logen(),
+        "우체국": PostOffice(),
+        "CJ": CJ(),
+        "롯데": Lotte(),
+        "DHL": DHL(),
+        "Amazon": Amazon(),
+        "EMS": EMS(),
+        "FedEx": FedEx()
+    })
+
+    # (배송 유형, 데코레이터, 택배사) 조합을 팩토리마다 한 번만 구성해서 한 번의 dict 조회로 전략을 찾음
+    # 택배사를 지정하면 유형/데코레이터와 무관하게 택배사 전략을 쓰므로 (None, None, 택배사)로 보관
+    def __init__(self):
+        self._resolved: Dict[Tuple[Optional[str], Optional[str], Optional[str]], ShippingStrategy] = {
+            **{(name, None, None): strategy for name, strategy in self.strategies.items()},
+            **{(name, decorator, None): ctor(strategy) for name, strategy in self.strategies.items() for decorator, ctor in self.decorators.items()},
+            **{(None, None, company): strategy for company, strategy in self.companies.items()},
+        }
 
     def get_shipping_strategy(self, type: str, decorator: Optional[str] = None, company: Optional[str] = None) -> ShippingStrategy:
-        try:
-            if company:
-                strategy = self.companies[company]()
-            else:
-                strategy = self.strategies[type]()
-                if decorator:
-                    strategy = self.decorators[decorator](strategy)
-            return strategy
-        except KeyError:
+        strategy = self._resolved.get((None, None, company) if company else (type, decorator or None, None))
+        if strategy is None:
             raise ValueError(f"오류 발생: {type} 또는 {decorator}는 지원되지 않는 옵션입니다.")
+        return strategy
+
+# 이벤트 종류 (옵저버 dict의 키로 쓰이므로 intern해서 조회가 동일성 비교로 끝나게 함)
+EVENT_STATUS = sys.intern("배송 상태")
 
 # 옵저버 패턴 구현
 class Subject:
+    __slots__ = ('_observers', '_state')
+
     def __init__(self):
-        self._observers: Dict[str, List[weakref.ref]] = {}
+        self._observers: DefaultDict[str, Dict[Hashable, weakref.ref]] = defaultdict(dict)
         self._state: Optional[str] = None
 
+    # 옵저버 객체뿐 아니라 바운드 메서드(branch.update 등)도 등록 가능
+    # 바운드 메서드는 접근할 때마다 새로 만들어지므로 WeakMethod로 보관하고 (객체, 함수)로 식별
+    @staticmethod
+    def _observer_key(observer) -> Hashable:
+        if isinstance(observer, types.MethodType):
+            return (id(observer.__self__), observer.__func__)
+        return id(observer)
+
+    # 등록 순서를 유지하면서 O(1) 등록/해제
+    # 옵저버가 수거되면 콜백으로 자기 항목을 바로 지워서 죽은 참조가 쌓이지 않게 함
     def attach(self, observer, event_type: str) -> None:
-        if event_type not in self._observers:
-            self._observers[event_type] = []
-        self._observers[event_type].append(weakref.ref(observer))
+        observers = self._observers[event_type]
+        key = self._observer_key(observer)
+
+        def remove(weak_observer: weakref.ref) -> None:
+            if observers.get(key) is weak_observer:
+                del observers[key]
+
+        if isinstance(observer, types.MethodType):
+            observers[key] = weakref.WeakMethod(observer, remove)
+        else:
+            observers[key] = weakref.ref(observer, remove)
 
     def detach(self, observer, event_type: str) -> None:
-        try:
-            self._observers[event_type].remove(weakref.ref(observer))
-        except (ValueError, KeyError):
-            pass
+        self._observers.get(event_type, {}).pop(self._observer_key(observer), None)
 
-    def notify(self, event_type: str) -> None:
-        for weak_observer in self._observers.get(event_type, []):
+    # 이벤트의 옵저버마다 상태 목록을 한 번에 전달 (바운드 메서드는 상태마다 호출)
+    # 알림 중에 옵저버가 detach하거나, 수거된 옵저버의 정리 콜백이 항목을 지워도 되도록 등록표의 스냅샷을 순회
+    def _dispatch(self, event_type: str, states: List[str]) -> None:
+        for weak_observer in tuple(self._observers.get(event_type, {}).values()):
             observer = weak_observer()
-            if observer is not None:
-                observer.update(self._state)
+            if observer is None:
+                continue
+            if isinstance(weak_observer, weakref.WeakMethod):
+                for state in states:
+                    observer(state)
+                continue
+            # Observer를 상속하지 않고 update만 있는 옵저버는 상태마다 update 호출
+            update_batch = getattr(observer, "update_batch", None)
+            if update_batch is not None:
+                update_batch(states)
+            else:
+                for state in states:
+                    observer.update(state)
+
+    def notify(self, event_type: str) -> None:
+        self._dispatch(event_type, [self._state])
 
     def set_state(self, state: str, event_type: str) -> None:
         self._state = state
         self.notify(event_type)
 
 # 옵저버 추상 클래스
-class Observer(ABC):
-    @abstractmethod
+class Observer:
+    __slots__ = ()
+
+    def __init_subclass__(cls, abstract: bool = False, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not abstract:
+            _check_implemented(cls, Observer, ("update",))
+
     def update(self, state: str) -> None:
-        pass
+        raise NotImplementedError
+
+    def update_batch(self, states: List[str]) -> None:
+        for state in states:
+            self.update(state)
+
+# 패키지 단위로 모아서 한 번에 출력하는 메시지 버퍼
+LogBuffer = List[str]
 
 # 지점 클래스(옵저버 구현)
 class Branch(Observer):
-    def __init__(self, name: str):
+    __slots__ = ('name', 'buffer', '__weakref__')
+
+    def __init__(self, name: str, buffer: Optional[LogBuffer] = None):
         self.name = name
+        self.buffer = buffer
 
+    # 버퍼가 없을 때는 INFO가 꺼져 있으면 메시지를 만들지 않음
     def update(self, state: str) -> None:
-        logging.info(f"{self.name} 알림: {state}")
+        if self.buffer is not None:
+            self.buffer.append(f"{self.name} 알림: {state}")
+        elif logger.isEnabledFor(logging.INFO):
+            logger.info("%s 알림: %s", self.name, state)
+
+    def update_batch(self, states: List[str]) -> None:
+        if self.buffer is not None:
+            self.buffer.append("\n".join(f"{self.name} 알림: {state}" for state in states))
+        elif logger.isEnabledFor(logging.INFO):
+            logger.info("%s", "\n".join(f"{self.name} 알림: {state}" for state in states))
 
 # 패키지 추적 클래스
 class PackageTracker:
-    def __init__(self, package_id: str):
+    __slots__ = ('package_id', 'history', 'buffer')
+
+    def __init__(self, package_id: str, buffer: Optional[LogBuffer] = None):
         self.package_id = package_id
-        self.history = []
+        self.history: Deque[str] = deque()
+        self.buffer = buffer
 
     def update_status(self, status: str):
         self.history.append(status)
-        logging.info(f"패키지 {self.package_id} 상태 업데이트: {status}")
-
-    def get_history(self) -> List[str]:
+        if self.buffer is not None:
+            self.buffer.append(f"패키지 {self.package_id} 상태 업데이트: {status}")
+        elif logger.isEnabledFor(logging.INFO):
+            logger.info("패키지 %s 상태 업데이트: %s", self.package_id, status)
+
+    def update_statuses(self, statuses: List[str]) -> None:
+        self.history.extend(statuses)
+        if self.buffer is not None:
+            self.buffer.append("\n".join(f"패키지 {self.package_id} 상태 업데이트: {status}" for status in statuses))
+        elif logger.isEnabledFor(logging.INFO):
+            logger.info("%s", "\n".join(f"패키지 {self.package_id} 상태 업데이트: {status}" for status in statuses))
+
+    # 복사하지 않고 내부 기록을 그대로 반환하므로 호출 측에서 수정하지 말 것
+    def get_history(self) -> Deque[str]:
         return self.history
 
 # 추적 가능한 패키지 클래스 (옵저버 패턴 구현)
 class TrackedPackage(Subject):
-    def __init__(self, package_id: str):
+    __slots__ = ('tracker',)
+
+    def __init__(self, package_id: str, buffer: Optional[LogBuffer] = None):
         super().__init__()
-        self.tracker = PackageTracker(package_id)
+        self.tracker = PackageTracker(package_id, buffer)
 
     def set_state(self, state: str, event_type: str) -> None:
         self.tracker.update_status(state)
-        self._state = state
-        self.notify(event_type)
+        super().set_state(state, event_type)
 
-# 추적 가능한 패키지 설정 함수
-def setup_tracked_package(destination: str, origin: str, departure_time: datetime, shipping_type: str, package_id: str, decorator: Optional[str], company: Optional[str], item_value: float, destination_country: str) -> None:
-    package = TrackedPackage(package_id)
-    branch_name = destination.capitalize() + " 지점"
-    branch = Branch(branch_name)
-    package.attach(branch, "배송 상태")
+    # 여러 상태 전이를 한 번에 기록하고, 옵저버마다 상태 목록을 한 번만 전달
+    def set_states(self, states: List[str], event_type: str) -> None:
+        if not states:
+            return
+        self.tracker.update_statuses(states)
+        self._state = states[-1]
+        self._dispatch(event_type, states)
+
+# 목적지별 지점 이름 (같은 목적지는 한 번만 만듦)
+@lru_cache(maxsize=256)
+def _branch_name(destination: str) -> str:
+    return destination.capitalize() + " 지점"
 
+# 추적 가능한 패키지 설정 함수
+def setup_tracked_package(destination: str, origin: str, departure_time: datetime, shipping_type: str, package_id: str, decorator: Optional[str], company: Optional[str], item_value: float, destination_country: str, branch: Optional[Branch] = None) -> None:
+    # 잘못된 옵션이면 지점 등 호출 측 객체를 건드리기 전에 ValueError
     shipping_option = shipping_factory.get_shipping_strategy(shipping_type, decorator, company)
+
+    # INFO가 꺼져 있으면 버퍼 없이 진행해서 출력용 문자열을 아예 만들지 않음
+    log_buffer: Optional[LogBuffer] = [] if logger.isEnabledFor(logging.INFO) else None
+    package = TrackedPackage(package_id, log_buffer)
     arrival_time = shipping_option.calculate_arrival_time(departure_time)
     cost = shipping_option.calculate_cost(item_value, destination_country)
-    logging.info(f"패키지 ID: {package_id}\n목적지: {destination}\n출발지: {origin}\n출발 시간: {departure_time}\n도착 시간: {arrival_time}\n배송 유형: {shipping_type}\n데코레이터: {decorator}\n택배 회사: {company}\n비용: {cost} 원")
+    if log_buffer is not None:
+        log_buffer.append(f"패키지 ID: {package_id}\n목적지: {destination}\n출발지: {origin}\n출발 시간: {departure_time}\n도착 시간: {arrival_time}\n배송 유형: {shipping_type}\n데코레이터: {decorator}\n택배 회사: {company}\n비용: {cost} 원")
 
     steps = shipping_option.get_delivery_steps(destination, origin, departure_time)
-    for step in steps:
-        package.set_state(step, "배송 상태")
-    package.detach(branch, "배송 상태")
-
-    logging.info(f"패키지 {package_id} 배송 기록:\n" + "\n".join(package.tracker.get_history()))
+    # 호출 측에서 목적지별로 미리 만든 지점을 넘기면 재사용 (예외가 나도 등록과 버퍼를 원래대로 되돌림)
+    if branch is None:
+        branch = Branch(_branch_name(destination))
+    previous_buffer = branch.buffer
+    branch.buffer = log_buffer
+    package.attach(branch, EVENT_STATUS)
+    try:
+        package.set_states(steps, EVENT_STATUS)
+    finally:
+        package.detach(branch, EVENT_STATUS)
+        branch.buffer = previous_buffer
+
+    if log_buffer is not None:
+        log_buffer.append(f"패키지 {package_id} 배송 기록:\n" + "\n".join(package.tracker.history))
+        logger.info("%s", "\n".join(log_buffer))
 
 # 팩토리 인스턴스 생성
 shipping_factory = ShippingFactory()
 
+# 패키지 ID 접미사: 실행마다 새로 뽑는 토큰 + 실행 안에서 증가하는 일련번호
+# 일련번호만으로는 실행 안에서만 유일하므로, 토큰으로 다른 실행의 같은 입력과도 구분
+_RUN_TOKEN = token_hex(4)
+_package_ids = count(1)
+
 # 지역 선택 함수
 def select_location(is_international: bool) -> str:
     if is_international:
@@ -367,23 +452,37 @@ def select_location(is_international: bool) -> str:
     else:
         return input('지역을 입력하세요: ').strip()
 
-# 사용자 입력
-is_international = input('해외 배송인가요? (예/아니오): ').strip().lower() == '예'
-origin = select_location(is_international)
-destination = select_location(is_international)
-departure_time_str = input('출발 시간을 입력하세요 (예: 2024-05-18 14:30): ').strip()
-departure_time = datetime.strptime(departure_time_str, '%Y-%m-%d %H:%M')
-if is_international:
-    shipping_type = "국제"
-    company = input('해외 택배 회사를 선택하세요 (DHL/Amazon/EMS/FedEx): ').strip()
-else:
-    shipping_type = input('배송 방법을 입력하세요 (일반/익일): ').strip()
-    company = input('택배 회사를 선택하세요 (한진/로젠/우체국/CJ/롯데): ').strip()
-decorator = input('적용할 데코레이터를 입력하세요 (보험/우선/없음): ').strip()
-decorator = None if decorator == "없음" else decorator
-item_value = float(input('상품 가격을 입력하세요 (원): ').strip())
-destination_country = destination.split(",")[-1].strip()
-
-# 패키지 ID 생성 및 설정
-package_id = f"{destination}_{origin}_{departure_time_str}_{shipping_type}_{company}_{hash(destination + origin + departure_time_str + shipping_type + company)}"
-setup_tracked_package(destination, origin, departure_time, shipping_type, package_id, decorator, company, item_value, destination_country)
+# 출발 시간 파싱 ('%Y-%m-%d %H:%M' 형식을 strptime 대신 미리 컴파일한 정규식으로 읽음)
+_DEPARTURE_TIME_RE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})\s+(\d{1,2}):(\d{1,2})")
+
+def parse_departure_time(text: str) -> datetime:
+    match = _DEPARTURE_TIME_RE.fullmatch(text)
+    if match is None:
+        raise ValueError(f"출발 시간 형식이 올바르지 않습니다: {text!r} (예: 2024-05-18 14:30)")
+    return datetime(*map(int, match.groups()))
+
+# 사용자 입력을 받아 패키지 하나를 설정 (import 시에는 실행되지 않음)
+def main() -> None:
+    is_international = input('해외 배송인가요? (예/아니오): ').strip().lower() == '예'
+    origin = select_location(is_international)
+    destination = select_location(is_international)
+    departure_time_str = input('출발 시간을 입력하세요 (예: 2024-05-18 14:30): ').strip()
+    departure_time = parse_departure_time(departure_time_str)
+    if is_international:
+        shipping_type = "국제"
+        company = input('해외 택배 회사를 선택하세요 (DHL/Amazon/EMS/FedEx): ').strip()
+    else:
+        shipping_type = input('배송 방법을 입력하세요 (일반/익일): ').strip()
+        company = input('택배 회사를 선택하세요 (한진/로젠/우체국/CJ/롯데): ').strip()
+    decorator = input('적용할 데코레이터를 입력하세요 (보험/우선/없음): ').strip()
+    decorator = None if decorator == "없음" else decorator
+    item_value = float(input('상품 가격을 입력하세요 (원): ').strip())
+    destination_country = destination.split(",")[-1].strip()
+
+    # 패키지 ID 생성 및 설정
+    package_id = f"{destination}_{origin}_{departure_time_str}_{shipping_type}_{company}_{_RUN_TOKEN}-{next(_package_ids)}"
+    branch = Branch(_branch_name(destination))
+    setup_tracked_package(destination, origin, departure_time, shipping_type, package_id, decorator, company, item_value, destination_country, branch)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import unittest
+
+import carries
+import carries_love
+
+MODULES = (carries, carries_love)
+
+
+# 알림 중 옵저버 등록표가 바뀌어도 알림이 깨지지 않는지 확인
+class SubjectDispatchTest(unittest.TestCase):
+    def test_observer_can_detach_itself_during_notify(self):
+        for module in MODULES:
+            with self.subTest(module=module.__name__):
+                received = []
+
+                class OneShot(module.Observer):
+                    def __init__(self, subject):
+                        self.subject = subject
+
+                    def update(self, state):
+                        received.append(state)
+                        self.subject.detach(self, "이벤트")
+
+                subject = module.Subject()
+                observer = OneShot(subject)
+                subject.attach(observer, "이벤트")
+                subject.set_state("첫 상태", "이벤트")
+                subject.set_state("두 번째 상태", "이벤트")
+                self.assertEqual(received, ["첫 상태"])
+
+    def test_observer_collected_during_notify_is_pruned_and_skipped(self):
+        for module in MODULES:
+            with self.subTest(module=module.__name__):
+                received = []
+
+                class Recorder(module.Observer):
+                    def __init__(self, name, on_update=None):
+                        self.name = name
+                        self.on_update = on_update
+
+                    def update(self, state):
+                        received.append(self.name)
+                        if self.on_update is not None:
+                            self.on_update()
+
+                keep_alive = [Recorder("나중")]
+                first = Recorder("먼저", on_update=keep_alive.clear)
+                subject = module.Subject()
+                subject.attach(first, "이벤트")
+                subject.attach(keep_alive[0], "이벤트")
+                subject.set_state("상태", "이벤트")
+                self.assertEqual(received, ["먼저"])
+                self.assertEqual(len(subject._observers["이벤트"]), 1)
+
+    def test_duck_typed_observer_without_update_batch(self):
+        for module in MODULES:
+            with self.subTest(module=module.__name__):
+                received = []
+
+                class Duck:
+                    def update(self, state):
+                        received.append(state)
+
+                duck = Duck()
+                package = module.TrackedPackage("패키지", [])
+                package.attach(duck, "이벤트")
+                package.set_state("하나", "이벤트")
+                package.set_states(["둘", "셋"], "이벤트")
+                self.assertEqual(received, ["하나", "둘", "셋"])
+
+
+# 배송 기록이 오래되어도 잘리지 않는지 확인
+class PackageHistoryTest(unittest.TestCase):
+    def test_history_keeps_every_status(self):
+        for module in MODULES:
+            with self.subTest(module=module.__name__):
+                package = module.TrackedPackage("패키지", [])
+                statuses = [str(i) for i in range(40)]
+                for status in statuses:
+                    package.set_state(status, "이벤트")
+                self.assertEqual(list(package.tracker.get_history()), statuses)
+
+
+# 필수 메서드를 빠뜨린 전략 클래스는 정의 시점에 거부되는지 확인
+class StrategyContractTest(unittest.TestCase):
+    def test_decorator_without_surcharge_is_rejected(self):
+        for module in MODULES:
+            with self.subTest(module=module.__name__):
+                with self.assertRaises(TypeError):
+                    class Broken(module.ShippingDecorator):
+                        pass
+
+
+# 팩토리 등록표와 조합 테이블이 어긋나지 않는지 확인
+class ShippingFactoryRegistryTest(unittest.TestCase):
+    def test_registries_are_read_only(self):
+        for module in MODULES:
+            with self.subTest(module=module.__name__):
+                with self.assertRaises(TypeError):
+                    module.ShippingFactory.companies["경동"] = module.ShippingFactory.companies["CJ"]
+
+    def test_subclass_registries_are_used(self):
+        for module in MODULES:
+            with self.subTest(module=module.__name__):
+                cj = module.ShippingFactory.companies["CJ"]
+
+                class KyungdongFactory(module.ShippingFactory):
+                    companies = {**module.ShippingFactory.companies, "경동": cj}
+
+                self.assertIs(KyungdongFactory().get_shipping_strategy("일반", None, "경동"), cj)
+                with self.assertRaises(ValueError):
+                    module.ShippingFactory().get_shipping_strategy("일반", None, "경동")
+
+
+if __name__ == "__main__":
+    unittest.main()